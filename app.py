@@ -3,45 +3,77 @@ Face Approval System - FastAPI Backend
 A secure face recognition platform for member access management
 """
 
-from fastapi import FastAPI, HTTPException, Request, Response
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Request, Response, UploadFile, File, Depends
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, ConfigDict
-from motor.motor_asyncio import AsyncIOMotorClient
-from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import Optional, List, Dict
+from pymongo import AsyncMongoClient, UpdateOne, WriteConcern
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure, PyMongoError
+from bson import Binary
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, WatchError
+from contextlib import asynccontextmanager, AsyncExitStack
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Tuple
 import secrets
+import hashlib
+import hmac
 import os
 import asyncio
+import time
+import orjson
 
 # ========== CONFIGURATION ==========
 
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = "face_approval_system"
-ADMIN_USERNAME = "root"
-ADMIN_PASSWORD = "ssh"
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "10"))  # per worker process
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "2"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "root")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "ssh")
+ADMIN_PASSWORD_HASH = hashlib.sha256(ADMIN_PASSWORD.encode()).digest()
 
-# ========== PYDANTIC MODELS ==========
+TEMP_FACE_TTL = 3600
+FACE_CACHE_SIZE = 10000
+REDIS_FACE_CACHE_TTL = 3600  # Shared cache, invalidated for all workers
+FACE_HASH_BYTES = 4096  # Leading image bytes used for the face hash
+
+MAX_CONSOLE_LOGS = 100
+LOG_BATCH_SIZE = 100
+LOG_FLUSH_INTERVAL = 0.05
+LOG_QUEUE_MAXSIZE = 10000
+
+HEALTH_PING_TTL = 2.0
+
+USER_LOCK_STRIPES = 64  # Power of two; edits of users on different stripes run concurrently
+
+# Pre-serialized /health bodies; "{ts}" is replaced with the timestamp
+HEALTHY_MONGODB = orjson.dumps(
+    {"status": "healthy", "storage": "mongodb", "mongodb": "connected", "timestamp": "{ts}"}
+)
+HEALTHY_IN_MEMORY = orjson.dumps(
+    {"status": "healthy", "storage": "in-memory", "mongodb": "disconnected", "timestamp": "{ts}"}
+)
+
+ADMIN_USER_PROJECTION = {"name": 1, "class": 1, "roll": 1, "code": 1, "registered_at": 1, "_id": 0}
+# Covers ADMIN_USER_PROJECTION; the admin find hints it since the planner
+# never picks an index for an unfiltered, unsorted find
+ADMIN_USER_INDEX = [("name", 1), ("class", 1), ("roll", 1), ("code", 1), ("registered_at", 1)]
 
-class FaceCaptureRequest(BaseModel):
-    """Model for face capture requests"""
-    face_image: str
+# ========== PYDANTIC MODELS ==========
 
 class RegisterEntryRequest(BaseModel):
     """Model for new user registration"""
-    model_config = ConfigDict(populate_by_name=True)
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra='ignore', str_strip_whitespace=True)
     
     name: str
     class_name: str = Field(..., alias='class')
     roll: str
-    face_image: str = ""
-
-class ApproveFaceRequest(BaseModel):
-    """Model for face approval requests"""
-    face_image: str
 
 class EndSessionRequest(BaseModel):
     """Model for ending sessions"""
@@ -58,37 +90,113 @@ class DeleteUserRequest(BaseModel):
 
 class EditUserRequest(BaseModel):
     """Model for editing user information"""
-    model_config = ConfigDict(populate_by_name=True)
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra='ignore', str_strip_whitespace=True)
     
     old_name: str
     name: str
     class_name: str = Field(..., alias='class')
     roll: str
 
+# ========== IN-MEMORY STORAGE ==========
+
+@dataclass(slots=True)
+class FaceTable:
+    """In-memory registered faces: one list per field, indexed by a stable user id"""
+    name_to_id: Dict[str, int] = field(default_factory=dict)
+    free_ids: List[int] = field(default_factory=list)  # Blanked ids reused by the next registration
+    name: List[Optional[str]] = field(default_factory=list)
+    class_name: List[Optional[str]] = field(default_factory=list)
+    roll: List[Optional[str]] = field(default_factory=list)
+    code: List[Optional[str]] = field(default_factory=list)
+    registered_at: List[Optional[datetime]] = field(default_factory=list)
+    face_hash: List[Optional[Binary]] = field(default_factory=list)
+
 # ========== GLOBAL VARIABLES ==========
 
-mongodb_client: Optional[AsyncIOMotorClient] = None
+mongodb_client: Optional[AsyncMongoClient] = None
+redis_client: Optional[Redis] = None
 database = None
 registered_faces_collection = None
 active_sessions_collection = None
 console_logs_collection = None
 temp_faces_collection = None
+log_queue: Optional[asyncio.Queue] = None
+log_consumer_task: Optional[asyncio.Task] = None
+
+# LRU cache of matched faces (face_hash -> user info) for in-memory storage,
+# whose users are per process anyway. The generation counts invalidations.
+face_cache: OrderedDict = OrderedDict()
+face_cache_names: Dict[str, Binary] = {}
+face_cache_generation = 0
+
+# Striped locks serializing edits of the same user, per worker process
+user_locks = [asyncio.Lock() for _ in range(USER_LOCK_STRIPES)]
+
+# Last MongoDB health ping (monotonic time, pre-serialized body)
+last_ping: Optional[Tuple[float, bytes]] = None
+
+# Formatted log and /health timestamps, reused until the second rolls over
+log_timestamp_second = 0
+log_timestamp_formatted = ""
+health_timestamp_second = 0
+health_timestamp_formatted = b""
 
 # Fallback in-memory storage
 in_memory_storage = {
-    'registered_faces': {},
-    'active_sessions': {},
+    'registered_faces': FaceTable(),
+    'active_sessions': {},  # user id -> session
     'console_logs': [],
     'temp_faces': {}
 }
 use_mongodb = True
+use_redis = False
+
+# Rendered dashboard page; the template doesn't depend on the request
+index_html: Optional[str] = None
 
 # ========== HELPER FUNCTIONS ==========
 
-async def log_action(action: str) -> None:
+def format_log_timestamp(timestamp: datetime) -> str:
+    """
+    Format a log timestamp, only calling strftime once per second
+    
+    Args:
+        timestamp: Time of the logged action
+        
+    Returns:
+        Timestamp formatted as YYYY-MM-DD HH:MM:SS
+    """
+    global log_timestamp_second, log_timestamp_formatted
+    
+    second = int(timestamp.timestamp())
+    if second != log_timestamp_second:
+        log_timestamp_formatted = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        log_timestamp_second = second
+    return log_timestamp_formatted
+
+def format_health_timestamp() -> bytes:
+    """
+    Format the /health timestamp, reusing it for the rest of the second
+    
+    Returns:
+        ISO 8601 timestamp with second precision, as bytes
+    """
+    global health_timestamp_second, health_timestamp_formatted
+    
+    now = datetime.now()
+    second = int(now.timestamp())
+    if second != health_timestamp_second:
+        health_timestamp_formatted = now.isoformat(timespec='seconds').encode()
+        health_timestamp_second = second
+    return health_timestamp_formatted
+
+def log_action(action: str) -> None:
     """
     Log action to MongoDB or in-memory storage
     
+    MongoDB writes are queued and flushed in batches by the log consumer,
+    so callers never wait on the database.
+    
     Args:
         action: Action description to log
     """
@@ -97,25 +205,275 @@ async def log_action(action: str) -> None:
         log_entry = {
             "timestamp": timestamp,
             "action": action,
-            "formatted": f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {action}"
+            "formatted": f"[{format_log_timestamp(timestamp)}] {action}"
         }
         
-        if use_mongodb and console_logs_collection is not None:
-            await console_logs_collection.insert_one(log_entry)
-            
-            # Keep only last 100 logs
-            count = await console_logs_collection.count_documents({})
-            if count > 100:
-                oldest_logs = await console_logs_collection.find().sort("timestamp", 1).limit(count - 100).to_list(length=count)
-                for log in oldest_logs:
-                    await console_logs_collection.delete_one({"_id": log["_id"]})
+        if use_mongodb and log_queue is not None:
+            log_queue.put_nowait(log_entry)
         else:
             in_memory_storage['console_logs'].append(log_entry['formatted'])
-            if len(in_memory_storage['console_logs']) > 100:
-                in_memory_storage['console_logs'] = in_memory_storage['console_logs'][-100:]
+            if len(in_memory_storage['console_logs']) > MAX_CONSOLE_LOGS:
+                in_memory_storage['console_logs'] = in_memory_storage['console_logs'][-MAX_CONSOLE_LOGS:]
+    except asyncio.QueueFull:
+        print(f"⚠️ Log queue full, dropping: {action}")
     except Exception as e:
         print(f"⚠️ Error logging action: {e}")
 
+async def log_consumer() -> None:
+    """
+    Drain the log queue and write entries to MongoDB in batches
+    
+    Collects up to LOG_BATCH_SIZE entries or LOG_FLUSH_INTERVAL seconds
+    worth, whichever comes first. A None entry stops the consumer.
+    """
+    loop = asyncio.get_running_loop()
+    running = True
+    
+    while running:
+        entry = await log_queue.get()
+        if entry is None:
+            break
+        
+        batch = [entry]
+        deadline = loop.time() + LOG_FLUSH_INTERVAL
+        while len(batch) < LOG_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                # Take already queued entries without scheduling a timeout
+                entry = log_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                try:
+                    entry = await asyncio.wait_for(log_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if entry is None:
+                running = False
+                break
+            batch.append(entry)
+        
+        try:
+            await console_logs_collection.insert_many(batch, ordered=False)
+        except Exception as e:
+            print(f"⚠️ Error writing logs: {e}")
+
+def start_log_consumer() -> None:
+    """Create the log queue and start the background log consumer"""
+    global log_queue, log_consumer_task
+    
+    log_queue = asyncio.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+    log_consumer_task = asyncio.create_task(log_consumer())
+
+async def stop_log_consumer() -> None:
+    """Flush queued logs and stop the background log consumer"""
+    global log_queue, log_consumer_task
+    
+    if log_consumer_task is None:
+        return
+    
+    await log_queue.put(None)
+    await log_consumer_task
+    log_queue = None
+    log_consumer_task = None
+
+def compute_face_hash(face_image: bytes) -> Binary:
+    """
+    Compute a stable hash of face image data for indexed lookups
+    
+    Args:
+        face_image: Raw uploaded image bytes
+        
+    Returns:
+        32-byte SHA-256 digest of the leading image data
+    """
+    return Binary(hashlib.sha256(face_image[:FACE_HASH_BYTES]).digest())
+
+async def get_cached_face(face_hash: Binary) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Get cached user info for a face hash
+    
+    The face cache is shared through Redis, or kept per process with in-memory
+    storage. MongoDB without Redis has no cache, since other workers couldn't
+    invalidate it.
+    
+    Args:
+        face_hash: Face hash from compute_face_hash
+        
+    Returns:
+        User info with name, class and roll (None if not cached), and the
+        cache generation to pass to cache_face after a storage lookup
+    """
+    if use_redis:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(f"face:{face_hash.hex()}")
+            pipe.get("face_gen")
+            user_info, generation = await pipe.execute()
+        return user_info or None, generation
+    
+    if use_mongodb:
+        return None, None
+    
+    user_info = face_cache.get(face_hash)
+    if user_info is not None:
+        face_cache.move_to_end(face_hash)
+    return user_info, str(face_cache_generation)
+
+async def cache_face(face_hash: Binary, user_info: Dict, generation: Optional[str]) -> None:
+    """
+    Cache user info for a matched face hash
+    
+    Nothing is cached if a user was edited or deleted since the generation
+    was read, since the looked-up user info may already be stale.
+    
+    Args:
+        face_hash: Face hash from compute_face_hash
+        user_info: Matched user document
+        generation: Cache generation returned by get_cached_face
+    """
+    cached = {
+        'name': user_info['name'],
+        'class': user_info['class'],
+        'roll': user_info['roll']
+    }
+    
+    if use_redis:
+        key = f"face:{face_hash.hex()}"
+        async with redis_client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch("face_gen")
+                if await pipe.get("face_gen") != generation:
+                    return
+                pipe.multi()
+                pipe.hset(key, mapping=cached)
+                pipe.expire(key, REDIS_FACE_CACHE_TTL)
+                pipe.set(f"face_name:{cached['name']}", face_hash.hex(), ex=REDIS_FACE_CACHE_TTL)
+                await pipe.execute()
+            except WatchError:
+                # Invalidated while caching
+                pass
+        return
+    
+    if use_mongodb or generation != str(face_cache_generation):
+        return
+    face_cache[face_hash] = cached
+    face_cache.move_to_end(face_hash)
+    face_cache_names[cached['name']] = face_hash
+    
+    if len(face_cache) > FACE_CACHE_SIZE:
+        _, evicted = face_cache.popitem(last=False)
+        face_cache_names.pop(evicted['name'], None)
+
+async def invalidate_cached_face(name: str) -> None:
+    """
+    Drop the cached face of a user after it was edited or deleted
+    
+    Args:
+        name: User name
+    """
+    global face_cache_generation
+    
+    if use_redis:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr("face_gen")
+            pipe.getdel(f"face_name:{name}")
+            _, face_hash = await pipe.execute()
+        if face_hash:
+            await redis_client.delete(f"face:{face_hash}")
+        return
+    
+    face_cache_generation += 1
+    face_hash = face_cache_names.pop(name, None)
+    if face_hash is not None:
+        face_cache.pop(face_hash, None)
+
+def add_memory_face(user_document: Dict) -> None:
+    """
+    Add a user to the in-memory face columns under a new or freed user id
+    
+    Args:
+        user_document: User with name, face_hash, class, roll, code and registered_at
+    """
+    faces = in_memory_storage['registered_faces']
+    if faces.free_ids:
+        user_id = faces.free_ids.pop()
+        faces.name[user_id] = user_document['name']
+        faces.class_name[user_id] = user_document['class']
+        faces.roll[user_id] = user_document['roll']
+        faces.code[user_id] = user_document['code']
+        faces.registered_at[user_id] = user_document['registered_at']
+        faces.face_hash[user_id] = user_document['face_hash']
+    else:
+        user_id = len(faces.name)
+        faces.name.append(user_document['name'])
+        faces.class_name.append(user_document['class'])
+        faces.roll.append(user_document['roll'])
+        faces.code.append(user_document['code'])
+        faces.registered_at.append(user_document['registered_at'])
+        faces.face_hash.append(user_document['face_hash'])
+    faces.name_to_id[user_document['name']] = user_id
+
+def remove_memory_face(name: str) -> bool:
+    """
+    Remove a user and its in-memory session, freeing the user id
+    
+    Args:
+        name: User name
+        
+    Returns:
+        True if the user existed
+    """
+    faces = in_memory_storage['registered_faces']
+    user_id = faces.name_to_id.pop(name, None)
+    if user_id is None:
+        return False
+    faces.name[user_id] = None
+    faces.class_name[user_id] = None
+    faces.roll[user_id] = None
+    faces.code[user_id] = None
+    faces.registered_at[user_id] = None
+    faces.face_hash[user_id] = None
+    faces.free_ids.append(user_id)
+    in_memory_storage['active_sessions'].pop(user_id, None)
+    return True
+
+def edit_memory_face(old_name: str, new_name: str, new_class: str, new_roll: str) -> None:
+    """
+    Update a user in the in-memory face columns
+    
+    Args:
+        old_name: Current user name
+        new_name: New user name
+        new_class: New class
+        new_roll: New roll number
+    """
+    faces = in_memory_storage['registered_faces']
+    name_to_id = faces.name_to_id
+    if old_name not in name_to_id:
+        raise HTTPException(status_code=404, detail=f"User '{old_name}' not found")
+    if old_name != new_name and new_name in name_to_id:
+        raise HTTPException(status_code=400, detail=f"User '{new_name}' already exists")
+    
+    # Records are keyed by user id; only the name index changes
+    user_id = name_to_id.pop(old_name)
+    name_to_id[new_name] = user_id
+    faces.name[user_id] = new_name
+    faces.class_name[user_id] = new_class
+    faces.roll[user_id] = new_roll
+
+def get_user_locks(*names: str) -> List[asyncio.Lock]:
+    """
+    Get the striped locks guarding the given user names
+    
+    Args:
+        names: User names
+        
+    Returns:
+        Distinct locks in stripe order, so callers always acquire them in the same order
+    """
+    stripes = sorted({hash(name) & (USER_LOCK_STRIPES - 1) for name in names})
+    return [user_locks[stripe] for stripe in stripes]
+
 def get_or_create_session_id(request: Request) -> str:
     """
     Get existing session ID from cookies or create new one
@@ -131,6 +489,64 @@ def get_or_create_session_id(request: Request) -> str:
         session_id = secrets.token_hex(16)
     return session_id
 
+async def save_temp_face(session_id: str, face_hash: Binary) -> None:
+    """
+    Temporarily store the hash of a captured face for a session
+    
+    Args:
+        session_id: Session identifier
+        face_hash: Face hash from compute_face_hash
+    """
+    if use_redis:
+        key = f"tmp:{session_id}"
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping={
+                "face_hash": face_hash.hex(),
+                "created_at": datetime.now().isoformat()
+            })
+            pipe.expire(key, TEMP_FACE_TTL)
+            await pipe.execute()
+    elif use_mongodb and temp_faces_collection is not None:
+        await temp_faces_collection.update_one(
+            {"session_id": session_id},
+            {
+                "$set": {
+                    "session_id": session_id,
+                    "face_hash": face_hash,
+                    "created_at": datetime.now()
+                }
+            },
+            upsert=True
+        )
+    else:
+        if session_id not in in_memory_storage['temp_faces']:
+            in_memory_storage['temp_faces'][session_id] = {}
+        in_memory_storage['temp_faces'][session_id]['face_hash'] = face_hash
+        in_memory_storage['temp_faces'][session_id]['created_at'] = datetime.now()
+
+async def get_temp_face(session_id: str) -> Optional[Binary]:
+    """
+    Get the temporarily stored face hash for a session
+    
+    Args:
+        session_id: Session identifier
+        
+    Returns:
+        Face hash or None
+    """
+    if use_redis:
+        face_hash = await redis_client.hget(f"tmp:{session_id}", "face_hash")
+        return Binary(bytes.fromhex(face_hash)) if face_hash else None
+    elif use_mongodb and temp_faces_collection is not None:
+        temp_face_doc = await temp_faces_collection.find_one(
+            {"session_id": session_id},
+            projection={"face_hash": 1, "_id": 0}
+        )
+        face_hash = temp_face_doc.get('face_hash') if temp_face_doc else None
+        return Binary(face_hash) if face_hash else None
+    else:
+        return in_memory_storage['temp_faces'].get(session_id, {}).get('face_hash')
+
 async def clear_temp_face(session_id: str) -> None:
     """
     Clear temporary face data for a session
@@ -139,18 +555,459 @@ async def clear_temp_face(session_id: str) -> None:
         session_id: Session identifier
     """
     try:
-        if use_mongodb and temp_faces_collection is not None:
+        if use_redis:
+            await redis_client.hdel(f"tmp:{session_id}", "face_hash")
+        elif use_mongodb and temp_faces_collection is not None:
             await temp_faces_collection.update_one(
                 {"session_id": session_id},
-                {"$unset": {"face_image": ""}}
+                {"$unset": {"face_hash": ""}}
             )
         else:
             if session_id in in_memory_storage['temp_faces']:
-                if 'face_image' in in_memory_storage['temp_faces'][session_id]:
-                    del in_memory_storage['temp_faces'][session_id]['face_image']
+                if 'face_hash' in in_memory_storage['temp_faces'][session_id]:
+                    del in_memory_storage['temp_faces'][session_id]['face_hash']
     except Exception as e:
         print(f"⚠️ Error clearing temp face: {e}")
 
+async def set_admin_session(session_id: str) -> None:
+    """
+    Mark a session as logged in as admin
+    
+    Args:
+        session_id: Session identifier
+    """
+    if use_redis:
+        await redis_client.setex(f"admin:{session_id}", TEMP_FACE_TTL, 1)
+    elif use_mongodb and temp_faces_collection is not None:
+        await temp_faces_collection.update_one(
+            {"session_id": session_id},
+            {"$set": {"session_id": session_id, "admin": True, "created_at": datetime.now()}},
+            upsert=True
+        )
+    else:
+        if session_id not in in_memory_storage['temp_faces']:
+            in_memory_storage['temp_faces'][session_id] = {}
+        in_memory_storage['temp_faces'][session_id]['admin'] = True
+
+async def is_admin_session(session_id: str) -> bool:
+    """
+    Check whether a session is logged in as admin
+    
+    Args:
+        session_id: Session identifier
+        
+    Returns:
+        True if the session has admin access
+    """
+    if use_redis:
+        return bool(await redis_client.exists(f"admin:{session_id}"))
+    elif use_mongodb and temp_faces_collection is not None:
+        session_doc = await temp_faces_collection.find_one({"session_id": session_id})
+        return bool(session_doc and session_doc.get('admin', False))
+    else:
+        return in_memory_storage['temp_faces'].get(session_id, {}).get('admin', False)
+
+async def clear_session_data(session_id: str) -> None:
+    """
+    Remove all temporary data (face image and admin flag) for a session
+    
+    Args:
+        session_id: Session identifier
+    """
+    if use_redis:
+        await redis_client.delete(f"tmp:{session_id}", f"admin:{session_id}")
+    elif use_mongodb and temp_faces_collection is not None:
+        await temp_faces_collection.delete_one({"session_id": session_id})
+    else:
+        if session_id in in_memory_storage['temp_faces']:
+            del in_memory_storage['temp_faces'][session_id]
+
+async def require_admin(request: Request) -> str:
+    """
+    FastAPI dependency that requires an admin session
+    
+    The result is cached on the request state so chained dependencies
+    don't repeat the lookup.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        Admin session ID
+    """
+    cached = getattr(request.state, "admin_session_id", None)
+    if cached:
+        return cached
+    
+    session_id = get_or_create_session_id(request)
+    if not await is_admin_session(session_id):
+        raise HTTPException(status_code=403, detail="Unauthorized. Admin access required.")
+    
+    request.state.admin_session_id = session_id
+    return session_id
+
+async def get_active_session(name: str) -> Optional[Dict]:
+    """
+    Get the active session for a user
+    
+    Args:
+        name: User name
+        
+    Returns:
+        Session document or None
+    """
+    if use_redis:
+        session_id = await redis_client.get(f"user_sess:{name}")
+        return {'name': name, 'session_id': session_id} if session_id else None
+    elif use_mongodb and active_sessions_collection is not None:
+        return await active_sessions_collection.find_one(
+            {"name": name},
+            projection={"session_id": 1, "_id": 0}
+        )
+    else:
+        user_id = in_memory_storage['registered_faces'].name_to_id.get(name)
+        return in_memory_storage['active_sessions'].get(user_id)
+
+async def create_active_session(session_document: Dict) -> Optional[Dict]:
+    """
+    Store a new active session, unless the user already has one
+    
+    Args:
+        session_document: Session with name, session_id and started_at
+        
+    Returns:
+        None if the session was stored, otherwise the user's existing session
+    """
+    name = session_document['name']
+    if use_redis:
+        session_id = session_document['session_id']
+        # Claim the user first so concurrent approvals can't both store a session;
+        # retry if the other session ended in between
+        while not await redis_client.set(f"user_sess:{name}", session_id, nx=True):
+            existing_id = await redis_client.get(f"user_sess:{name}")
+            if existing_id:
+                return {'name': name, 'session_id': existing_id}
+        await redis_client.hset(f"sess:{session_id}", mapping={
+            'name': name,
+            'session_id': session_id,
+            'started_at': session_document['started_at'].isoformat()
+        })
+    elif use_mongodb and active_sessions_collection is not None:
+        while True:
+            try:
+                await active_sessions_collection.insert_one(session_document)
+                break
+            except DuplicateKeyError:
+                existing = await active_sessions_collection.find_one(
+                    {"name": name},
+                    projection={"session_id": 1, "_id": 0}
+                )
+                if existing:
+                    return existing
+    else:
+        user_id = in_memory_storage['registered_faces'].name_to_id.get(name)
+        if user_id is not None:
+            sessions = in_memory_storage['active_sessions']
+            if user_id in sessions:
+                return sessions[user_id]
+            sessions[user_id] = session_document
+    return None
+
+async def end_active_session(session_id: str) -> Optional[str]:
+    """
+    Remove an active session by its session ID
+    
+    Args:
+        session_id: Active session identifier
+        
+    Returns:
+        Name of the session owner, or None if not found
+    """
+    if use_redis:
+        name = await redis_client.hget(f"sess:{session_id}", "name")
+        if name:
+            await redis_client.delete(f"sess:{session_id}", f"user_sess:{name}")
+        return name
+    elif use_mongodb and active_sessions_collection is not None:
+        session = await active_sessions_collection.find_one_and_delete(
+            {"session_id": session_id},
+            projection={"name": 1}
+        )
+        if session:
+            return session['name']
+    else:
+        for user_id, session in list(in_memory_storage['active_sessions'].items()):
+            if session['session_id'] == session_id:
+                del in_memory_storage['active_sessions'][user_id]
+                return in_memory_storage['registered_faces'].name[user_id]
+    return None
+
+async def delete_active_session(name: str) -> None:
+    """
+    Remove the active session of a user, if any
+    
+    Args:
+        name: User name
+    """
+    if use_redis:
+        session_id = await redis_client.getdel(f"user_sess:{name}")
+        if session_id:
+            await redis_client.delete(f"sess:{session_id}")
+    elif use_mongodb and active_sessions_collection is not None:
+        await active_sessions_collection.delete_one({"name": name})
+    else:
+        user_id = in_memory_storage['registered_faces'].name_to_id.get(name)
+        in_memory_storage['active_sessions'].pop(user_id, None)
+
+async def rename_active_session(old_name: str, new_name: str) -> bool:
+    """
+    Move the active session of a user to a new name, if any
+    
+    Never overwrites a session that already exists under the new name.
+    
+    Args:
+        old_name: Current user name
+        new_name: New user name
+        
+    Returns:
+        True if a session was moved
+    """
+    if use_redis:
+        session_id = await redis_client.get(f"user_sess:{old_name}")
+        if not session_id or not await redis_client.renamenx(f"user_sess:{old_name}", f"user_sess:{new_name}"):
+            return False
+        await redis_client.hset(f"sess:{session_id}", "name", new_name)
+        return True
+    elif use_mongodb and active_sessions_collection is not None:
+        try:
+            result = await active_sessions_collection.update_one(
+                {"name": old_name},
+                {"$set": {"name": new_name}}
+            )
+        except DuplicateKeyError:
+            return False
+        return result.modified_count > 0
+    else:
+        # In-memory sessions are keyed by user id and follow the user's name
+        return False
+
+async def rename_active_sessions(renames: List[Tuple[str, str]]) -> None:
+    """
+    Move the active sessions of several users to new names
+    
+    Like rename_active_session, sessions are never moved onto an existing one.
+    
+    Args:
+        renames: (old_name, new_name) pairs
+    """
+    if not renames:
+        return
+    if use_mongodb and active_sessions_collection is not None and not use_redis:
+        try:
+            await active_sessions_collection.bulk_write(
+                [UpdateOne({"name": old_name}, {"$set": {"name": new_name}}) for old_name, new_name in renames],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            # Duplicate keys are sessions left in place; anything else is a real failure
+            if any(error['code'] != 11000 for error in e.details['writeErrors']):
+                raise
+    else:
+        await asyncio.gather(*(rename_active_session(old_name, new_name) for old_name, new_name in renames))
+
+async def list_active_sessions() -> List[Dict]:
+    """
+    Get all active sessions
+    
+    Returns:
+        List of session documents
+    """
+    if use_redis:
+        keys = [key async for key in redis_client.scan_iter(match="sess:*")]
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            sessions = await pipe.execute()
+        return [session for session in sessions if session]
+    elif use_mongodb and active_sessions_collection is not None:
+        return await active_sessions_collection.find(
+            {},
+            projection={"name": 1, "session_id": 1, "started_at": 1, "_id": 0}
+        ).to_list(length=1000)
+    else:
+        names = in_memory_storage['registered_faces'].name
+        return [
+            {**session, 'name': names[user_id]}
+            for user_id, session in in_memory_storage['active_sessions'].items()
+        ]
+
+async def apply_user_edits(edits: List[EditUserRequest]) -> Tuple[List[EditUserRequest], Dict[str, HTTPException]]:
+    """
+    Apply user edits, moving active sessions along with renamed users
+    
+    On MongoDB the user updates and the session renames each go out as one
+    unordered bulk write. Edits that fail don't stop the others.
+    
+    Args:
+        edits: Edit requests, at most one per user
+        
+    Returns:
+        Applied edits, and the error of each failed edit keyed by its old name
+    """
+    old_names = {edit.old_name for edit in edits}
+    new_names = {edit.name for edit in edits}
+    if len(old_names) != len(edits) or len(new_names) != len(edits):
+        raise HTTPException(status_code=400, detail="Each user can only be edited once per request")
+    if any(edit.name != edit.old_name and edit.name in old_names for edit in edits):
+        raise HTTPException(status_code=400, detail="Renames can't reuse the name of another edited user")
+    
+    errors = {}
+    # Same-user edits serialize; edits of other users proceed in parallel
+    async with AsyncExitStack() as stack:
+        for lock in get_user_locks(*old_names, *new_names):
+            await stack.enter_async_context(lock)
+        
+        if use_mongodb and registered_faces_collection is not None:
+            batch = list(edits)
+            if len(edits) > 1:
+                # A single update's matched count already tells whether its user exists
+                found = await registered_faces_collection.find(
+                    {"name": {"$in": list(old_names)}},
+                    projection={"name": 1, "_id": 0}
+                ).to_list(length=None)
+                found = {user['name'] for user in found}
+                batch = [edit for edit in edits if edit.old_name in found]
+                for edit in edits:
+                    if edit.old_name not in found:
+                        errors[edit.old_name] = HTTPException(status_code=404, detail=f"User '{edit.old_name}' not found")
+            
+            failed = set()
+            matched = 0
+            if batch:
+                # Unique index on name rejects renames onto an existing user
+                try:
+                    result = await registered_faces_collection.bulk_write(
+                        [
+                            UpdateOne(
+                                {"name": edit.old_name},
+                                {"$set": {"name": edit.name, "class": edit.class_name, "roll": edit.roll}}
+                            )
+                            for edit in batch
+                        ],
+                        ordered=False
+                    )
+                    matched = result.matched_count
+                except BulkWriteError as e:
+                    matched = e.details['nMatched']
+                    for error in e.details['writeErrors']:
+                        edit = batch[error['index']]
+                        failed.add(error['index'])
+                        if error['code'] == 11000:
+                            errors[edit.old_name] = HTTPException(status_code=400, detail=f"User '{edit.name}' already exists")
+                        else:
+                            errors[edit.old_name] = HTTPException(status_code=500, detail=f"Edit error: {error['errmsg']}")
+            applied = [edit for i, edit in enumerate(batch) if i not in failed]
+            
+            if matched != len(applied):
+                # Users deleted after the existence check (or a lone missing user) matched nothing
+                if len(applied) == 1:
+                    present = set()
+                else:
+                    present = await registered_faces_collection.find(
+                        {"name": {"$in": [edit.name for edit in applied]}},
+                        projection={"name": 1, "_id": 0}
+                    ).to_list(length=None)
+                    present = {user['name'] for user in present}
+                for edit in applied:
+                    if edit.name not in present:
+                        errors[edit.old_name] = HTTPException(status_code=404, detail=f"User '{edit.old_name}' not found")
+                applied = [edit for edit in applied if edit.name in present]
+        else:
+            applied = []
+            for edit in edits:
+                try:
+                    edit_memory_face(edit.old_name, edit.name, edit.class_name, edit.roll)
+                except HTTPException as e:
+                    errors[edit.old_name] = e
+                else:
+                    applied.append(edit)
+        
+        # Sessions only move once their user's rename went through, so they are
+        # never briefly filed under another existing user's name
+        await rename_active_sessions(
+            [(edit.old_name, edit.name) for edit in applied if edit.old_name != edit.name]
+        )
+        
+        await asyncio.gather(*(invalidate_cached_face(edit.old_name) for edit in applied))
+    
+    for edit in applied:
+        log_action(f"USER EDITED: {edit.old_name} → {edit.name} (by Admin)")
+    return applied, errors
+
+async def initialize_redis() -> bool:
+    """
+    Initialize Redis connection for sessions and temporary face data
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    global redis_client
+    
+    try:
+        redis_client = Redis.from_url(REDIS_URL, decode_responses=True, socket_connect_timeout=5)
+        await redis_client.ping()
+        print("⚡ Sessions: Redis Connected")
+        return True
+    except Exception as e:
+        print(f"⚠️  Redis unavailable ({e}) - sessions stored in primary storage")
+        redis_client = None
+        return False
+
+async def initialize_console_logs():
+    """
+    Create the console logs collection as a capped collection
+    
+    Returns:
+        Console logs collection with unacknowledged (w=0) writes
+    """
+    try:
+        await database.create_collection(
+            "console_logs",
+            capped=True,
+            size=65536,
+            max=MAX_CONSOLE_LOGS
+        )
+    except CollectionInvalid:
+        # Collection already exists - convert it once if it predates capping
+        options = await database["console_logs"].options()
+        if not options.get('capped'):
+            await database.command("convertToCapped", "console_logs", size=65536)
+        # convertToCapped only caps by size; set the entry limit separately
+        if options.get('max') != MAX_CONSOLE_LOGS:
+            try:
+                await database.command("collMod", "console_logs", cappedMax=MAX_CONSOLE_LOGS)
+            except OperationFailure as e:
+                # cappedMax needs MongoDB 6.0+; older servers stay capped by size only
+                print(f"⚠️  Could not limit console logs to {MAX_CONSOLE_LOGS} entries: {e}")
+    
+    await database["console_logs"].create_index("timestamp")
+    
+    # Losing the latest few log lines is acceptable; don't wait for the server
+    return database.get_collection("console_logs", write_concern=WriteConcern(w=0))
+
+async def purge_expired_temp_faces() -> None:
+    """
+    Delete expired temporary faces in one bulk delete
+    
+    The TTL monitor only runs once a minute, so leftovers from before a
+    restart are removed up front instead of trickling out.
+    """
+    try:
+        expired_before = datetime.now() - timedelta(seconds=TEMP_FACE_TTL)
+        await temp_faces_collection.delete_many({"created_at": {"$lt": expired_before}})
+    except Exception as e:
+        print(f"⚠️ Error purging expired temp faces: {e}")
+
 async def initialize_mongodb() -> bool:
     """
     Initialize MongoDB connection and collections
@@ -163,25 +1020,34 @@ async def initialize_mongodb() -> bool:
     global console_logs_collection, temp_faces_collection
     
     try:
-        mongodb_client = AsyncIOMotorClient(MONGODB_URL, serverSelectionTimeoutMS=5000)
+        mongodb_client = AsyncMongoClient(
+            MONGODB_URL,
+            serverSelectionTimeoutMS=5000,
+            maxPoolSize=MONGODB_MAX_POOL_SIZE,
+            minPoolSize=MONGODB_MIN_POOL_SIZE,
+            compressors="zstd,zlib",
+            retryWrites=True,
+            w=1
+        )
         database = mongodb_client[DATABASE_NAME]
         
-        # Test connection
+        # Test connection (the driver opens minPoolSize connections in the background)
         await database.command('ping')
         
         # Initialize collections
         registered_faces_collection = database["registered_faces"]
         active_sessions_collection = database["active_sessions"]
-        console_logs_collection = database["console_logs"]
+        console_logs_collection = await initialize_console_logs()
         temp_faces_collection = database["temp_faces"]
         
         # Create indexes for performance
         await registered_faces_collection.create_index("name", unique=True)
+        await registered_faces_collection.create_index("face_hash")
+        await registered_faces_collection.create_index(ADMIN_USER_INDEX)
         await active_sessions_collection.create_index("name", unique=True)
         await active_sessions_collection.create_index("session_id", unique=True)
-        await console_logs_collection.create_index("timestamp")
         await temp_faces_collection.create_index("session_id", unique=True)
-        await temp_faces_collection.create_index("created_at", expireAfterSeconds=3600)
+        await temp_faces_collection.create_index("created_at", expireAfterSeconds=TEMP_FACE_TTL)
         
         print("\n" + "="*60)
         print("✅ Face Approval System Started Successfully!")
@@ -213,22 +1079,35 @@ async def lifespan(app: FastAPI):
     """
     Manage application lifespan (startup and shutdown)
     """
-    global use_mongodb
+    global use_mongodb, use_redis
     
     # Startup
     use_mongodb = await initialize_mongodb()
     if use_mongodb:
-        await log_action("=== SYSTEM STARTED WITH MONGODB ===")
+        use_redis = await initialize_redis()
+    else:
+        # Redis keys outlive in-memory users, so a restart would hand a new
+        # user the sessions of an old one with the same name
+        print("⚠️  Redis skipped - sessions kept in memory with the users")
+        use_redis = False
+    if use_mongodb:
+        start_log_consumer()
+        await purge_expired_temp_faces()
+        log_action("=== SYSTEM STARTED WITH MONGODB ===")
     else:
-        await log_action("=== SYSTEM STARTED WITH IN-MEMORY STORAGE ===")
+        log_action("=== SYSTEM STARTED WITH IN-MEMORY STORAGE ===")
     
     yield
     
     # Shutdown
     if mongodb_client and use_mongodb:
-        await log_action("=== SYSTEM SHUTDOWN ===")
-        mongodb_client.close()
+        log_action("=== SYSTEM SHUTDOWN ===")
+        await stop_log_consumer()
+        await mongodb_client.close()
         print("\n✅ MongoDB connection closed gracefully\n")
+    
+    if redis_client and use_redis:
+        await redis_client.aclose()
 
 # ========== FASTAPI APP INITIALIZATION ==========
 
@@ -236,6 +1115,7 @@ app = FastAPI(
     title="Face Approval System",
     description="Secure face recognition platform for member access management",
     version="2.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -249,10 +1129,8 @@ app.add_middleware(
 )
 
 # Create directories if they don't exist
-for directory in ["static", "templates"]:
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        print(f"✅ Created {directory}/ directory")
+for directory in ("static", "templates"):
+    os.makedirs(directory, exist_ok=True)
 
 # Static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -262,9 +1140,13 @@ templates = Jinja2Templates(directory="templates")
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    """Render main dashboard page"""
+    """Render main dashboard page (rendered once, then served from cache)"""
+    global index_html
+    
     try:
-        return templates.TemplateResponse("index.html", {"request": request})
+        if index_html is None:
+            index_html = templates.get_template("index.html").render()
+        return HTMLResponse(content=index_html)
     except Exception as e:
         return HTMLResponse(content=f"""
         <!DOCTYPE html>
@@ -304,45 +1186,28 @@ async def index(request: Request):
         """)
 
 @app.post("/api/capture-face")
-async def capture_face(request: Request, data: FaceCaptureRequest):
+async def capture_face(request: Request, face_image: UploadFile = File(...)):
     """
-    Capture and temporarily store face image
+    Capture face image and temporarily store its hash
     
     Args:
-        data: Face capture request with base64 image
+        face_image: Uploaded face image
         
     Returns:
         Success response
     """
     try:
-        face_image = data.face_image
+        raw = await face_image.read()
         
-        if not face_image or len(face_image) < 100:
+        if len(raw) < 100:
             raise HTTPException(status_code=400, detail="Invalid face data - image too small or empty")
         
         session_id = get_or_create_session_id(request)
+        await save_temp_face(session_id, compute_face_hash(raw))
         
-        if use_mongodb and temp_faces_collection is not None:
-            await temp_faces_collection.update_one(
-                {"session_id": session_id},
-                {
-                    "$set": {
-                        "session_id": session_id,
-                        "face_image": face_image,
-                        "created_at": datetime.now()
-                    }
-                },
-                upsert=True
-            )
-        else:
-            if session_id not in in_memory_storage['temp_faces']:
-                in_memory_storage['temp_faces'][session_id] = {}
-            in_memory_storage['temp_faces'][session_id]['face_image'] = face_image
-            in_memory_storage['temp_faces'][session_id]['created_at'] = datetime.now()
-        
-        await log_action(f"Face captured for registration (Session: {session_id[:8]}...)")
+        log_action(f"Face captured for registration (Session: {session_id[:8]}...)")
         
-        response = JSONResponse(content={
+        response = ORJSONResponse(content={
             'success': True, 
             'message': 'Face captured successfully'
         })
@@ -351,7 +1216,7 @@ async def capture_face(request: Request, data: FaceCaptureRequest):
     except HTTPException:
         raise
     except Exception as e:
-        await log_action(f"ERROR: Face capture failed - {str(e)}")
+        log_action(f"ERROR: Face capture failed - {str(e)}")
         raise HTTPException(status_code=500, detail=f"Face capture error: {str(e)}")
 
 @app.post("/api/register-entry")
@@ -366,39 +1231,37 @@ async def register_entry(request: Request, data: RegisterEntryRequest):
         Success response with unique code
     """
     try:
-        name = data.name.strip()
-        class_name = data.class_name.strip()
-        roll = data.roll.strip()
+        name = data.name
+        class_name = data.class_name
+        roll = data.roll
         
         if not name or not class_name or not roll:
             raise HTTPException(status_code=400, detail="All fields are required (name, class, roll)")
         
-        # Get face data from session or request
+        # Get captured face from session
         session_id = get_or_create_session_id(request)
-        face_data = data.face_image if data.face_image else None
-        
-        if not face_data:
-            if use_mongodb and temp_faces_collection is not None:
-                temp_face_doc = await temp_faces_collection.find_one({"session_id": session_id})
-                if temp_face_doc:
-                    face_data = temp_face_doc.get('face_image')
-            else:
-                temp_face = in_memory_storage['temp_faces'].get(session_id, {})
-                face_data = temp_face.get('face_image')
+        face_hash = await get_temp_face(session_id)
         
-        if not face_data:
+        if not face_hash:
             raise HTTPException(
                 status_code=400, 
                 detail="No face captured. Please capture your face first using the camera."
             )
         
-        # Check if user already exists
+        # Check if user already exists; users from older versions have no
+        # face_hash and re-enroll under their existing name
+        reenroll = False
         if use_mongodb and registered_faces_collection is not None:
-            existing_user = await registered_faces_collection.find_one({"name": name})
+            existing_user = await registered_faces_collection.find_one(
+                {"name": name},
+                projection={"face_hash": 1}
+            )
             if existing_user:
-                raise HTTPException(status_code=400, detail=f'User "{name}" is already registered. Please use a different name.')
+                if 'face_hash' in existing_user:
+                    raise HTTPException(status_code=400, detail=f'User "{name}" is already registered. Please use a different name.')
+                reenroll = True
         else:
-            if name in in_memory_storage['registered_faces']:
+            if name in in_memory_storage['registered_faces'].name_to_id:
                 raise HTTPException(status_code=400, detail=f'User "{name}" is already registered. Please use a different name.')
         
         # Generate unique access code
@@ -407,22 +1270,36 @@ async def register_entry(request: Request, data: RegisterEntryRequest):
         # Store user with face data
         user_document = {
             'name': name,
-            'face_data': face_data[:500],  # Store hash of face data
+            'face_hash': face_hash,
             'class': class_name,
             'roll': roll,
             'code': code,
             'registered_at': datetime.now()
         }
         
-        if use_mongodb and registered_faces_collection is not None:
+        if reenroll:
+            # Keep registered_at; drop the legacy base64 face_data of this user only
+            result = await registered_faces_collection.update_one(
+                {"name": name, "face_hash": {"$exists": False}},
+                {
+                    "$set": {"face_hash": face_hash, "class": class_name, "roll": roll, "code": code},
+                    "$unset": {"face_data": ""}
+                }
+            )
+            if result.matched_count == 0:
+                raise HTTPException(status_code=400, detail=f'User "{name}" is already registered. Please use a different name.')
+        elif use_mongodb and registered_faces_collection is not None:
             await registered_faces_collection.insert_one(user_document)
         else:
-            in_memory_storage['registered_faces'][name] = user_document
+            add_memory_face(user_document)
         
         # Clear temp face data after successful registration
         await clear_temp_face(session_id)
         
-        await log_action(f"NEW REGISTRATION: {name} | Class: {class_name} | Roll: {roll} | Code: {code}")
+        if reenroll:
+            log_action(f"RE-ENROLLED: {name} | Class: {class_name} | Roll: {roll} | Code: {code}")
+        else:
+            log_action(f"NEW REGISTRATION: {name} | Class: {class_name} | Roll: {roll} | Code: {code}")
         
         return {
             'success': True, 
@@ -433,67 +1310,77 @@ async def register_entry(request: Request, data: RegisterEntryRequest):
     except HTTPException:
         raise
     except Exception as e:
-        await log_action(f"ERROR: Registration failed - {str(e)}")
+        log_action(f"ERROR: Registration failed - {str(e)}")
         raise HTTPException(status_code=500, detail=f'Registration error: {str(e)}')
 
 @app.post("/api/approve-face")
-async def approve_face(request: Request, data: ApproveFaceRequest):
+async def approve_face(request: Request, face_image: UploadFile = File(...)):
     """
     Approve face and start new session
     
     Args:
-        data: Face approval request with image
+        face_image: Uploaded face image
         
     Returns:
         Session information if approved
     """
     try:
-        face_image = data.face_image
+        raw = await face_image.read()
         
-        if not face_image or len(face_image) < 100:
+        if len(raw) < 100:
             raise HTTPException(status_code=400, detail="No face captured. Please position your face in the camera.")
         
-        # Check if any users are registered
-        if use_mongodb and registered_faces_collection is not None:
-            user_count = await registered_faces_collection.count_documents({})
-            if user_count == 0:
-                raise HTTPException(status_code=400, detail="No registered users found. Please register first.")
-            users = await registered_faces_collection.find().to_list(length=1000)
-        else:
-            if not in_memory_storage['registered_faces']:
-                raise HTTPException(status_code=400, detail="No registered users found. Please register first.")
-            users = [{'name': k, **v} for k, v in in_memory_storage['registered_faces'].items()]
-        
         # Match face (simplified matching - in production use ML model)
-        matched_user = None
-        face_hash = face_image[:500]
-        
-        for user in users:
-            if user.get('face_data') == face_hash:
-                matched_user = user['name']
-                break
+        face_hash = compute_face_hash(raw)
+        user_info, generation = await get_cached_face(face_hash)
         
-        # Fallback to first user for demo (remove in production)
-        if not matched_user and users:
-            matched_user = users[0]['name']
-            await log_action(f"⚠️ Using fallback match for demo: {matched_user}")
+        if user_info is None:
+            # A missing match covers both "no users registered" and "not recognized"
+            if use_mongodb and registered_faces_collection is not None:
+                user_info = await registered_faces_collection.find_one(
+                    {"face_hash": face_hash},
+                    projection={"name": 1, "class": 1, "roll": 1}
+                )
+            else:
+                faces = in_memory_storage['registered_faces']
+                if not faces.name_to_id:
+                    raise HTTPException(status_code=400, detail="No registered users found. Please register first.")
+                try:
+                    user_id = faces.face_hash.index(face_hash)
+                    user_info = {'name': faces.name[user_id], 'class': faces.class_name[user_id], 'roll': faces.roll[user_id]}
+                except ValueError:
+                    user_info = None
+            
+            if not user_info:
+                raise HTTPException(status_code=400, detail="Face not recognized. Please register first.")
+            
+            await cache_face(face_hash, user_info, generation)
         
-        if not matched_user:
-            raise HTTPException(status_code=400, detail="Face not recognized. Please register first.")
+        matched_user = user_info['name']
         
         # Check if user already has active session
-        if use_mongodb and active_sessions_collection is not None:
-            existing_session = await active_sessions_collection.find_one({"name": matched_user})
-            user_info = await registered_faces_collection.find_one({"name": matched_user})
-        else:
-            existing_session = in_memory_storage['active_sessions'].get(matched_user)
-            user_info = in_memory_storage['registered_faces'].get(matched_user)
+        session_id = get_or_create_session_id(request)
+        existing_session = await get_active_session(matched_user)
         
         if existing_session:
-            session_id = get_or_create_session_id(request)
             await clear_temp_face(session_id)
+        else:
+            # Create new session and clear temp face after approval
+            session_id_new = f"#DB{secrets.token_hex(8).upper()}"
+            session_document = {
+                'name': matched_user,
+                'session_id': session_id_new,
+                'started_at': datetime.now()
+            }
             
-            await log_action(f"Session already active for: {matched_user}")
+            # A concurrent approval of the same user may have won the race
+            existing_session, _ = await asyncio.gather(
+                create_active_session(session_document),
+                clear_temp_face(session_id)
+            )
+        
+        if existing_session:
+            log_action(f"Session already active for: {matched_user}")
             
             return {
                 'success': True,
@@ -504,24 +1391,7 @@ async def approve_face(request: Request, data: ApproveFaceRequest):
                 'roll': user_info['roll']
             }
         
-        # Create new session
-        session_id_new = f"#DB{secrets.token_hex(8).upper()}"
-        session_document = {
-            'name': matched_user,
-            'session_id': session_id_new,
-            'started_at': datetime.now()
-        }
-        
-        if use_mongodb and active_sessions_collection is not None:
-            await active_sessions_collection.insert_one(session_document)
-        else:
-            in_memory_storage['active_sessions'][matched_user] = session_document
-        
-        # Clear temp face after approval
-        session_id = get_or_create_session_id(request)
-        await clear_temp_face(session_id)
-        
-        await log_action(f"SESSION STARTED: {matched_user} | Session: {session_id_new}")
+        log_action(f"SESSION STARTED: {matched_user} | Session: {session_id_new}")
         
         return {
             'success': True,
@@ -534,7 +1404,7 @@ async def approve_face(request: Request, data: ApproveFaceRequest):
     except HTTPException:
         raise
     except Exception as e:
-        await log_action(f"ERROR: Face approval failed - {str(e)}")
+        log_action(f"ERROR: Face approval failed - {str(e)}")
         raise HTTPException(status_code=500, detail=f'Approval error: {str(e)}')
 
 @app.post("/api/end-session")
@@ -551,24 +1421,16 @@ async def end_session(data: EndSessionRequest):
     try:
         session_id = data.session_id
         
-        if use_mongodb and active_sessions_collection is not None:
-            session = await active_sessions_collection.find_one({"session_id": session_id})
-            if session:
-                await active_sessions_collection.delete_one({"session_id": session_id})
-                await log_action(f"SESSION ENDED: {session['name']} | {session_id}")
-                return {'success': True, 'message': 'Session ended successfully'}
-        else:
-            for name, session in list(in_memory_storage['active_sessions'].items()):
-                if session['session_id'] == session_id:
-                    del in_memory_storage['active_sessions'][name]
-                    await log_action(f"SESSION ENDED: {name} | {session_id}")
-                    return {'success': True, 'message': 'Session ended successfully'}
+        name = await end_active_session(session_id)
+        if name:
+            log_action(f"SESSION ENDED: {name} | {session_id}")
+            return {'success': True, 'message': 'Session ended successfully'}
         
         raise HTTPException(status_code=404, detail="Session not found")
     except HTTPException:
         raise
     except Exception as e:
-        await log_action(f"ERROR: End session failed - {str(e)}")
+        log_action(f"ERROR: End session failed - {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error ending session: {str(e)}")
 
 @app.post("/api/admin-login")
@@ -583,32 +1445,26 @@ async def admin_login(request: Request, data: AdminLoginRequest):
         Success response with session cookie
     """
     try:
-        if data.username == ADMIN_USERNAME and data.password == ADMIN_PASSWORD:
+        # Constant-time comparison; both checks always run
+        username_ok = hmac.compare_digest(data.username.encode(), ADMIN_USERNAME.encode())
+        password_ok = hmac.compare_digest(hashlib.sha256(data.password.encode()).digest(), ADMIN_PASSWORD_HASH)
+        
+        if username_ok and password_ok:
             session_id = get_or_create_session_id(request)
+            await set_admin_session(session_id)
             
-            if use_mongodb and temp_faces_collection is not None:
-                await temp_faces_collection.update_one(
-                    {"session_id": session_id},
-                    {"$set": {"session_id": session_id, "admin": True, "created_at": datetime.now()}},
-                    upsert=True
-                )
-            else:
-                if session_id not in in_memory_storage['temp_faces']:
-                    in_memory_storage['temp_faces'][session_id] = {}
-                in_memory_storage['temp_faces'][session_id]['admin'] = True
-            
-            await log_action(f"ADMIN LOGIN: Successful (Username: {data.username})")
+            log_action(f"ADMIN LOGIN: Successful (Username: {data.username})")
             
-            response = JSONResponse(content={'success': True, 'message': 'Admin login successful'})
+            response = ORJSONResponse(content={'success': True, 'message': 'Admin login successful'})
             response.set_cookie(key="session_id", value=session_id, httponly=True, samesite="lax")
             return response
         
-        await log_action(f"ADMIN LOGIN: Failed attempt (Username: {data.username})")
+        log_action(f"ADMIN LOGIN: Failed attempt (Username: {data.username})")
         raise HTTPException(status_code=401, detail="Invalid credentials. Please check username and password.")
     except HTTPException:
         raise
     except Exception as e:
-        await log_action(f"ERROR: Admin login failed - {str(e)}")
+        log_action(f"ERROR: Admin login failed - {str(e)}")
         raise HTTPException(status_code=500, detail=f"Login error: {str(e)}")
 
 @app.post("/api/admin-logout")
@@ -621,20 +1477,15 @@ async def admin_logout(request: Request):
     """
     try:
         session_id = get_or_create_session_id(request)
+        await clear_session_data(session_id)
         
-        if use_mongodb and temp_faces_collection is not None:
-            await temp_faces_collection.delete_one({"session_id": session_id})
-        else:
-            if session_id in in_memory_storage['temp_faces']:
-                del in_memory_storage['temp_faces'][session_id]
-        
-        await log_action("ADMIN LOGOUT: Successful")
+        log_action("ADMIN LOGOUT: Successful")
         
-        response = JSONResponse(content={'success': True, 'message': 'Logged out successfully'})
+        response = ORJSONResponse(content={'success': True, 'message': 'Logged out successfully'})
         response.delete_cookie(key="session_id")
         return response
     except Exception as e:
-        await log_action(f"ERROR: Admin logout failed - {str(e)}")
+        log_action(f"ERROR: Admin logout failed - {str(e)}")
         raise HTTPException(status_code=500, detail=f"Logout error: {str(e)}")
 
 @app.post("/api/clear-face")
@@ -662,48 +1513,67 @@ async def admin_data():
     """
     try:
         if use_mongodb and registered_faces_collection is not None:
-            users = await registered_faces_collection.find().to_list(length=1000)
-            sessions = await active_sessions_collection.find().to_list(length=1000)
-            logs = await console_logs_collection.find().sort("timestamp", -1).limit(50).to_list(length=50)
+            users, sessions, logs = await asyncio.gather(
+                registered_faces_collection.find(
+                    {},
+                    projection=ADMIN_USER_PROJECTION
+                ).hint(ADMIN_USER_INDEX).to_list(length=1000),
+                list_active_sessions(),
+                console_logs_collection.find(
+                    {},
+                    projection={"formatted": 1, "_id": 0}
+                ).sort("timestamp", -1).limit(50).to_list(length=50)
+            )
             formatted_logs = [log['formatted'] for log in logs]
         else:
-            users = [{'name': k, **v} for k, v in in_memory_storage['registered_faces'].items()]
-            sessions = list(in_memory_storage['active_sessions'].values())
+            faces = in_memory_storage['registered_faces']
+            users = [
+                {'name': name, 'class': class_name, 'roll': roll, 'code': code, 'registered_at': registered_at}
+                for name, class_name, roll, code, registered_at in zip(
+                    faces.name, faces.class_name, faces.roll, faces.code, faces.registered_at
+                )
+                if name is not None
+            ]
+            sessions = await list_active_sessions()
             formatted_logs = in_memory_storage['console_logs'][-50:]
         
-        session_lookup = {s['name']: s for s in sessions}
-        members = [user['name'] for user in users]
-        
-        sessions_list = [
-            {
+        # Single pass over sessions; users then only need a dict lookup
+        sessions_list = []
+        session_lookup = {}
+        for s in sessions:
+            session_info = {
                 'name': s['name'],
                 'session_id': s['session_id'],
-                'started_at': s['started_at'].isoformat() if isinstance(s['started_at'], datetime) else str(s['started_at'])
+                'started_at': s['started_at']
             }
-            for s in sessions
-        ]
+            sessions_list.append(session_info)
+            session_lookup[s['name']] = session_info
         
+        members = []
         users_list = []
         for user in users:
-            session_info = session_lookup.get(user['name'], {})
+            session_info = session_lookup.get(user['name'])
+            members.append(user['name'])
             users_list.append({
                 'name': user['name'],
                 'class': user['class'],
                 'roll': user['roll'],
                 'code': user['code'],
-                'session_id': session_info.get('session_id', 'No active session'),
-                'has_active_session': user['name'] in session_lookup,
-                'registered_at': user['registered_at'].isoformat() if isinstance(user.get('registered_at'), datetime) else 'Unknown'
+                'session_id': session_info['session_id'] if session_info else 'No active session',
+                'has_active_session': session_info is not None,
+                'registered_at': user.get('registered_at') or 'Unknown'
             })
         
-        return {
+        # Returned as a response so orjson serializes the datetimes directly,
+        # skipping FastAPI's jsonable_encoder pass over every user and session
+        return ORJSONResponse(content={
             'members': members,
             'sessions': sessions_list,
             'users': users_list,
             'logs': formatted_logs
-        }
+        })
     except Exception as e:
-        await log_action(f"ERROR: Admin data fetch failed - {str(e)}")
+        log_action(f"ERROR: Admin data fetch failed - {str(e)}")
         return {
             'error': str(e), 
             'members': [], 
@@ -713,7 +1583,7 @@ async def admin_data():
         }
 
 @app.post("/api/delete-user")
-async def delete_user(request: Request, data: DeleteUserRequest):
+async def delete_user(data: DeleteUserRequest, admin_session: str = Depends(require_admin)):
     """
     Delete user from database (admin only)
     
@@ -724,45 +1594,34 @@ async def delete_user(request: Request, data: DeleteUserRequest):
         Success response
     """
     try:
-        session_id = get_or_create_session_id(request)
-        
-        # Check admin authorization
-        is_admin = False
-        if use_mongodb and temp_faces_collection is not None:
-            session_doc = await temp_faces_collection.find_one({"session_id": session_id})
-            is_admin = session_doc and session_doc.get('admin', False)
-        else:
-            temp = in_memory_storage['temp_faces'].get(session_id, {})
-            is_admin = temp.get('admin', False)
-        
-        if not is_admin:
-            raise HTTPException(status_code=403, detail="Unauthorized. Admin access required.")
-        
         name = data.name
         
-        if use_mongodb and registered_faces_collection is not None:
-            user = await registered_faces_collection.find_one({"name": name})
-            if not user:
-                raise HTTPException(status_code=404, detail=f"User '{name}' not found")
-            await registered_faces_collection.delete_one({"name": name})
-            await active_sessions_collection.delete_one({"name": name})
-        else:
-            if name not in in_memory_storage['registered_faces']:
-                raise HTTPException(status_code=404, detail=f"User '{name}' not found")
-            del in_memory_storage['registered_faces'][name]
-            if name in in_memory_storage['active_sessions']:
-                del in_memory_storage['active_sessions'][name]
+        # Serializes with edits of the same user
+        async with get_user_locks(name)[0]:
+            if use_mongodb and registered_faces_collection is not None:
+                user, _session = await asyncio.gather(
+                    registered_faces_collection.find_one_and_delete({"name": name}, projection={"_id": 1}),
+                    delete_active_session(name)
+                )
+                if not user:
+                    raise HTTPException(status_code=404, detail=f"User '{name}' not found")
+            else:
+                if not remove_memory_face(name):
+                    raise HTTPException(status_code=404, detail=f"User '{name}' not found")
+                await delete_active_session(name)
+            
+            await invalidate_cached_face(name)
         
-        await log_action(f"USER DELETED: {name} (by Admin)")
+        log_action(f"USER DELETED: {name} (by Admin)")
         return {'success': True, 'message': f'User "{name}" deleted successfully'}
     except HTTPException:
         raise
     except Exception as e:
-        await log_action(f"ERROR: Delete user failed - {str(e)}")
+        log_action(f"ERROR: Delete user failed - {str(e)}")
         raise HTTPException(status_code=500, detail=f"Delete error: {str(e)}")
 
 @app.post("/api/edit-user")
-async def edit_user(request: Request, data: EditUserRequest):
+async def edit_user(data: EditUserRequest, admin_session: str = Depends(require_admin)):
     """
     Edit user information (admin only)
     
@@ -773,75 +1632,40 @@ async def edit_user(request: Request, data: EditUserRequest):
         Success response
     """
     try:
-        session_id = get_or_create_session_id(request)
-        
-        # Check admin authorization
-        is_admin = False
-        if use_mongodb and temp_faces_collection is not None:
-            session_doc = await temp_faces_collection.find_one({"session_id": session_id})
-            is_admin = session_doc and session_doc.get('admin', False)
-        else:
-            temp = in_memory_storage['temp_faces'].get(session_id, {})
-            is_admin = temp.get('admin', False)
-        
-        if not is_admin:
-            raise HTTPException(status_code=403, detail="Unauthorized. Admin access required.")
-        
-        old_name = data.old_name
-        new_name = data.name
-        new_class = data.class_name
-        new_roll = data.roll
-        
-        if use_mongodb and registered_faces_collection is not None:
-            user = await registered_faces_collection.find_one({"name": old_name})
-            if not user:
-                raise HTTPException(status_code=404, detail=f"User '{old_name}' not found")
-            
-            if old_name != new_name:
-                existing = await registered_faces_collection.find_one({"name": new_name})
-                if existing:
-                    raise HTTPException(status_code=400, detail=f"User '{new_name}' already exists")
-                
-                user['name'] = new_name
-                user['class'] = new_class
-                user['roll'] = new_roll
-                await registered_faces_collection.delete_one({"name": old_name})
-                await registered_faces_collection.insert_one(user)
-                
-                session = await active_sessions_collection.find_one({"name": old_name})
-                if session:
-                    session['name'] = new_name
-                    await active_sessions_collection.delete_one({"name": old_name})
-                    await active_sessions_collection.insert_one(session)
-            else:
-                await registered_faces_collection.update_one(
-                    {"name": old_name},
-                    {"$set": {"class": new_class, "roll": new_roll}}
-                )
-        else:
-            if old_name not in in_memory_storage['registered_faces']:
-                raise HTTPException(status_code=404, detail=f"User '{old_name}' not found")
-            
-            if old_name != new_name:
-                if new_name in in_memory_storage['registered_faces']:
-                    raise HTTPException(status_code=400, detail=f"User '{new_name}' already exists")
-                in_memory_storage['registered_faces'][new_name] = in_memory_storage['registered_faces'][old_name]
-                del in_memory_storage['registered_faces'][old_name]
-                
-                if old_name in in_memory_storage['active_sessions']:
-                    in_memory_storage['active_sessions'][new_name] = in_memory_storage['active_sessions'][old_name]
-                    del in_memory_storage['active_sessions'][old_name]
-            
-            in_memory_storage['registered_faces'][new_name]['name'] = new_name
-            in_memory_storage['registered_faces'][new_name]['class'] = new_class
-            in_memory_storage['registered_faces'][new_name]['roll'] = new_roll
-        
-        await log_action(f"USER EDITED: {old_name} → {new_name} (by Admin)")
+        _applied, errors = await apply_user_edits([data])
+        if errors:
+            raise errors[data.old_name]
         return {'success': True, 'message': f'User updated successfully'}
     except HTTPException:
         raise
-    except Exception as e:
-        await log_action(f"ERROR: Edit user failed - {str(e)}")
+    except (PyMongoError, RedisError, KeyError) as e:
+        log_action(f"ERROR: Edit user failed - {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Edit error: {str(e)}")
+
+@app.post("/api/edit-users")
+async def edit_users(edits: List[EditUserRequest], admin_session: str = Depends(require_admin)):
+    """
+    Edit several users at once (admin only)
+    
+    Edits that fail don't stop the others.
+    
+    Args:
+        edits: Edit requests, at most one per user
+        
+    Returns:
+        New names of the updated users and an error per failed edit
+    """
+    try:
+        applied, errors = await apply_user_edits(edits)
+        return {
+            'success': not errors,
+            'updated': [edit.name for edit in applied],
+            'errors': {old_name: error.detail for old_name, error in errors.items()}
+        }
+    except HTTPException:
+        raise
+    except (PyMongoError, RedisError, KeyError) as e:
+        log_action(f"ERROR: Edit users failed - {str(e)}")
         raise HTTPException(status_code=500, detail=f"Edit error: {str(e)}")
 
 @app.get("/health")
@@ -852,29 +1676,28 @@ async def health_check():
     Returns:
         System health status
     """
-    try:
-        if use_mongodb and database:
-            await database.command('ping')
-            return {
-                "status": "healthy",
-                "storage": "mongodb",
-                "mongodb": "connected",
-                "timestamp": datetime.now().isoformat()
-            }
-        else:
-            return {
-                "status": "healthy",
-                "storage": "in-memory",
-                "mongodb": "disconnected",
-                "timestamp": datetime.now().isoformat()
-            }
-    except Exception as e:
-        return {
-            "status": "degraded",
-            "storage": "in-memory (fallback)",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }
+    global last_ping
+    
+    if not (use_mongodb and database is not None):
+        body = HEALTHY_IN_MEMORY
+    else:
+        # Reuse the ping outcome for HEALTH_PING_TTL seconds
+        now = time.monotonic()
+        if last_ping is None or now - last_ping[0] >= HEALTH_PING_TTL:
+            try:
+                await database.command('ping')
+                body = HEALTHY_MONGODB
+            except Exception as e:
+                body = orjson.dumps({
+                    "status": "degraded",
+                    "storage": "in-memory (fallback)",
+                    "error": str(e),
+                    "timestamp": "{ts}"
+                })
+            last_ping = (now, body)
+        body = last_ping[1]
+    
+    return Response(content=body.replace(b"{ts}", format_health_timestamp()), media_type="application/json")
 
 # ========== RUN SERVER ==========
 
@@ -884,9 +1707,12 @@ if __name__ == "__main__":
     print("\n🚀 Starting Face Approval System...")
     print("📦 Installing requirements if needed...\n")
     
+    # Worker count comes from WEB_CONCURRENCY (default 1); in-memory
+    # fallback storage and the face cache are per process. The default
+    # "auto" loop and http pick uvloop and httptools when installed.
     uvicorn.run(
-        app, 
-        host="0.0.0.0", 
+        "app:app",
+        host="0.0.0.0",
         port=8000,
         log_level="info"
     )
@@ -1,5 +1,6 @@
 import os
 import sys
+from functools import lru_cache
 
 PLATFORMS = {
     "render": [
@@ -39,12 +40,25 @@ PLATFORMS = {
     ],
 }
 
-def check_presence(path, is_folder=None):
-    if is_folder or (is_folder is None and path.endswith('/')):
-        exists = os.path.isdir(path.rstrip('/'))
-    else:
-        exists = os.path.isfile(path)
-    return exists
+# Precompute (path, is_folder) pairs; folders are listed with a trailing "/"
+PLATFORMS = {
+    platform: [(item.rstrip('/'), item.endswith('/')) for item in checklist]
+    for platform, checklist in PLATFORMS.items()
+}
+
+@lru_cache(maxsize=None)
+def scan_top_level():
+    """Map top-level entry names to whether they are folders, in one scandir pass"""
+    with os.scandir('.') as entries:
+        return {entry.name: entry.is_dir() for entry in entries}
+
+@lru_cache(maxsize=None)
+def isfile(path):
+    return os.path.isfile(path)
+
+@lru_cache(maxsize=None)
+def isdir(path):
+    return os.path.isdir(path)
 
 def run_platform_check(platform):
     print(f"\nChecking files for platform: {platform.upper()}")
@@ -53,12 +67,16 @@ def run_platform_check(platform):
         print(f"Unknown platform: {platform}")
         sys.exit(1)
 
+    top_level = scan_top_level()
     all_good = True
-    for item in checklist:
-        is_folder = item.endswith("/")
-        present = check_presence(item, is_folder)
+    for path, is_folder in checklist:
+        if '/' in path:
+            # Nested paths aren't covered by the top-level scan
+            present = isdir(path) if is_folder else isfile(path)
+        else:
+            present = top_level.get(path) == is_folder
         status = "✅" if present else "❌"
-        print(f"{status} {item}")
+        print(f"{status} {path}/" if is_folder else f"{status} {path}")
         if not present:
             all_good = False
     if all_good:
@@ -66,10 +84,18 @@ def run_platform_check(platform):
     else:
         print("\n⚠️  Please add the missing files/folders for", platform.capitalize())
 
+def run_all():
+    """Check every platform; the cached scans make each path stat only once"""
+    for platform in PLATFORMS:
+        run_platform_check(platform)
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Health check for deployment files")
-    parser.add_argument("--platform", type=str, choices=PLATFORMS.keys(), default="local",
-                        help="Deployment platform to check (default: local)")
+    parser.add_argument("--platform", type=str, choices=[*PLATFORMS, "all"], default="local",
+                        help="Deployment platform to check, or 'all' (default: local)")
     args = parser.parse_args()
-    run_platform_check(args.platform)
+    if args.platform == "all":
+        run_all()
+    else:
+        run_platform_check(args.platform)
@@ -1,6 +1,7 @@
 // ========== GLOBAL VARIABLES ==========
 let videoStream = null;
 let capturedFaceData = null;
+let previewUrl = null;
 let currentSessionId = null;
 
 const mainSections = {
@@ -43,6 +44,31 @@ async function adminLogout() {
   }
 }
 
+function captureFrame(canvas) {
+  return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
+}
+
+function faceFormData(faceBlob) {
+  const formData = new FormData();
+  formData.append('face_image', faceBlob, 'face.jpg');
+  return formData;
+}
+
+function showPreview(faceBlob) {
+  // Release the previous capture's URL in case it never finished loading
+  if (previewUrl) URL.revokeObjectURL(previewUrl);
+  const url = URL.createObjectURL(faceBlob);
+  previewUrl = url;
+  
+  const preview = document.getElementById('previewImage');
+  // The decoded image stays on screen after its blob URL is revoked
+  preview.onload = preview.onerror = () => {
+    URL.revokeObjectURL(url);
+    if (previewUrl === url) previewUrl = null;
+  };
+  preview.src = url;
+}
+
 function stopCamera() {
   if (videoStream) {
     videoStream.getTracks().forEach(track => track.stop());
@@ -145,9 +171,9 @@ document.getElementById('captureBtn').onclick = async () => {
   canvas.height = video.videoHeight || 480;
   ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
   
-  capturedFaceData = canvas.toDataURL('image/jpeg', 0.8);
+  capturedFaceData = await captureFrame(canvas);
   
-  document.getElementById('previewImage').src = capturedFaceData;
+  showPreview(capturedFaceData);
   document.getElementById('capturePreview').classList.remove('hidden');
   document.getElementById('video').style.display = 'none';
   document.getElementById('captureBtn').style.display = 'none';
@@ -156,8 +182,7 @@ document.getElementById('captureBtn').onclick = async () => {
   try {
     const response = await fetch('/api/capture-face', {
       method: 'POST',
-      headers: {'Content-Type': 'application/json'},
-      body: JSON.stringify({ face_image: capturedFaceData })
+      body: faceFormData(capturedFaceData)
     });
     
     if (!response.ok) {
@@ -270,13 +295,12 @@ document.getElementById('approveCaptureBtn').onclick = async () => {
   canvas.height = video.videoHeight || 480;
   ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
   
-  const faceData = canvas.toDataURL('image/jpeg', 0.8);
+  const faceData = await captureFrame(canvas);
   
   try {
     const response = await fetch('/api/approve-face', {
       method: 'POST',
-      headers: {'Content-Type': 'application/json'},
-      body: JSON.stringify({ face_image: faceData })
+      body: faceFormData(faceData)
     });
     
     stopCamera();